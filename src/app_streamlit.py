@@ -15,7 +15,7 @@ PROJECT_ROOT = os.path.abspath(os.path.join(THIS_DIR, ".."))
 sys.path.insert(0, os.path.join(PROJECT_ROOT, "src"))
 
 from services import (
-    load_rows, build_options, apply_pipeline, PROJECT_COLS
+    load_table, build_options, apply_pipeline, PROJECT_COLS
 )
 from utils_io import to_csv_string
 
@@ -23,6 +23,26 @@ DATA_DIR = os.path.join(PROJECT_ROOT, "data")
 SUBSET_PATH = os.path.join(DATA_DIR, "spotify_subset.csv")
 
 st.set_page_config(page_title="Spotify Mini-DB App (Your Functions)", layout="wide")
+
+
+# Streamlit re-runs this whole script on every widget change, so the parse and
+# the option scans are cached. The mtime is part of the key so editing the CSV
+# invalidates both. The table is read-only downstream, so cache_resource hands
+# back the same object instead of unpickling a copy on every rerun; `_table` is
+# skipped by the cache_data hasher and the (path, mtime) pair identifies it.
+# Only the current table is kept (max_entries=1), so editing the CSV does not
+# leave older tables cached for the life of the server.
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _cached_load_table(path: str, mtime: float):
+    return load_table(path)
+
+# Called twice per rerun (genre None, then the chosen genre), so keep enough
+# entries for "all genres" plus every genre (the dataset has 6). It never holds
+# a table (`_table` is not hashed or stored), only the small option lists.
+@st.cache_data(show_spinner=False, max_entries=8)
+def _cached_build_options(_table, path: str, mtime: float, genre_choice):
+    return build_options(_table, genre_choice)
+
 st.title("🎵 Spotify Mini-DB App (UI only)")
 st.caption("This UI calls your parser and DataFrame functions via modular services. No data logic in the UI.")
 
@@ -31,12 +51,13 @@ if not os.path.exists(SUBSET_PATH):
     st.error(f"Missing file: {SUBSET_PATH}. Run your subset script first.")
     st.stop()
 
-rows = load_rows(SUBSET_PATH)  # csv_parser.read_csv (under the hood in services)
+subset_mtime = os.path.getmtime(SUBSET_PATH)
+table = _cached_load_table(SUBSET_PATH, subset_mtime)  # csv_parser.read_csv_columns (under the hood in services)
 
 # 2) Sidebar filters (options provided by services)
 st.sidebar.header("Filters (ANY = no filter)")
 # Build options (genres/subgenres/tempos are computed off dataset)
-opt = build_options(rows, genre_choice=None)
+opt = _cached_build_options(table, SUBSET_PATH, subset_mtime, genre_choice=None)
 
 pop_bucket   = st.sidebar.selectbox("Track popularity", opt["pop_options"], index=0)
 dance_bucket = st.sidebar.selectbox("Danceability", opt["float_buckets"], index=0)
@@ -46,7 +67,7 @@ tempo_bucket = st.sidebar.selectbox("Tempo (BPM)", opt["tempo_options"], index=0
 
 genre_choice = st.sidebar.selectbox("Playlist genre", opt["genres"], index=0)
 # refresh subgenre options based on chosen genre
-opt2 = build_options(rows, genre_choice=genre_choice)
+opt2 = _cached_build_options(table, SUBSET_PATH, subset_mtime, genre_choice=genre_choice)
 subgenre_choice = st.sidebar.selectbox("Playlist subgenre", opt2["subgenres"], index=0)
 
 month_label = st.sidebar.selectbox("Release month", opt["month_labels"], index=0)
@@ -57,7 +78,7 @@ sort_choice = None if sort_choice == "None" else sort_choice
 
 # 3) Apply pipeline
 df_raw, df_filtered, df_projected, df_grouped, df_sorted = apply_pipeline(
-    rows,
+    table,
     pop_bucket, genre_choice, subgenre_choice,
     dance_bucket, energy_bucket, tempo_bucket, live_bucket,
     month_label, year_label, sort_choice
@@ -80,7 +101,7 @@ with st.expander("Show example filtered rows (first 10)"):
 # 6) SELECT (project)
 st.header("3) SELECT (Project)")
 st.caption("Always showing: track_name, track_artist, track_album_name, track_album_release_date")
-st.dataframe(df_projected.rows, use_container_width=True, height=420)
+st.dataframe(df_projected.cols, use_container_width=True, height=420)
 st.write(f"Projected rows: **{df_projected.count()}**")
 
 csv_data = to_csv_string(df_projected.rows, PROJECT_COLS)
@@ -90,22 +111,21 @@ st.download_button("⬇️ Download projected results (CSV)", data=csv_data.enco
 # 7) GROUP BY + ORDER BY
 st.header("4) GROUP BY (by track_artist) + Aggregation")
 st.caption("Aggregations: avg(track_popularity), avg(danceability) per artist")
-st.dataframe(df_grouped.rows, use_container_width=True, height=420)
+st.dataframe(df_grouped.cols, use_container_width=True, height=420)
 st.write(f"Artist groups: **{df_grouped.count()}**")
 
 st.header("5) ORDER BY (Sort)")
 if sort_choice:
     st.caption(f"Sorted ascending by avg {sort_choice}")
-st.dataframe(df_sorted.rows, use_container_width=True, height=420)
+st.dataframe(df_sorted.cols, use_container_width=True, height=420)
 
 # 8) Trace (for your report)
 st.header("6) Operation Trace (for your report)")
 st.markdown("""
-- **Load & Parse**: `rows = read_csv('data/spotify_subset.csv')` (via `services.load_rows`)
-- **Construct**: `df_raw = DataFrame(rows)`
-- **WHERE**: `df_filtered = df_raw.filter(predicate)` (predicate built in `filters.build_predicate`)
-- **SELECT**: `df_projected = df_filtered.project([...])`
-- **GROUP BY**: `df_grouped = df_filtered.group_by('track_artist', {'track_popularity':'avg','danceability':'avg'})`
+- **Load & Parse**: `cols = read_csv_columns('data/spotify_subset.csv')` (via `services.load_table`)
+- **Construct**: `df_raw = DataFrame.from_columns(cols)`
+- **WHERE**: `selection = build_selection(df_raw.cols, ...)` (row positions, in `filters.build_selection`)
+- **WHERE + SELECT + GROUP BY**: `df_filtered, df_projected, df_grouped = df_raw.filter_project_group(selection, [...], 'track_artist', {'track_popularity':'avg','danceability':'avg'})`
 - **ORDER BY**: `df_sorted = df_grouped.sort_by('<chosen_agg>', reverse=False)`
 - **COUNT**: `df_raw.count(), df_filtered.count(), df_grouped.count()`
 """)
@@ -45,11 +45,14 @@ def clean_csv(input_path: str, output_path: str, keep_cols):
 
     - Skips columns not in KEEP_COLS
     - Warns if expected columns are missing
+    - Streams row by row, so memory use does not grow with the file size
     """
     if not os.path.exists(input_path):
         raise FileNotFoundError(f"Input CSV not found: {input_path}")
 
-    with open(input_path, "r", encoding="utf-8", newline="") as infile:
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(input_path, "r", encoding="utf-8", newline="") as infile, \
+         open(output_path, "w", encoding="utf-8", newline="") as outfile:
         reader = csv.DictReader(infile)
         available_cols = reader.fieldnames or []
         missing = [c for c in keep_cols if c not in available_cols]
@@ -57,17 +60,17 @@ def clean_csv(input_path: str, output_path: str, keep_cols):
             print(f"⚠️ Warning: missing columns: {missing}")
 
         cols_to_use = [c for c in keep_cols if c in available_cols]
-        rows = [ {col: row.get(col, "") for col in cols_to_use} for row in reader ]
 
-    # Write subset CSV
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, "w", encoding="utf-8", newline="") as outfile:
-        writer = csv.DictWriter(outfile, fieldnames=cols_to_use)
+        # extrasaction="ignore" drops the other columns as each row is written
+        writer = csv.DictWriter(outfile, fieldnames=cols_to_use, extrasaction="ignore")
         writer.writeheader()
-        writer.writerows(rows)
+        n_rows = 0
+        for row in reader:
+            writer.writerow(row)
+            n_rows += 1
 
     print(f"✅ Wrote subset CSV: {output_path}")
-    print(f"   Rows: {len(rows):,} | Columns kept: {len(cols_to_use)} ({cols_to_use})")
+    print(f"   Rows: {n_rows:,} | Columns kept: {len(cols_to_use)} ({cols_to_use})")
 
 
 # ---------------------------------------------------------------
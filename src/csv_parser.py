@@ -1,21 +1,32 @@
 """
 CSV parser v4:
-- Handles quoted fields and commas inside quotes
+- Handles quoted fields and commas inside quotes (via the csv module's C reader)
+- Parses column by column (one list per header) or into row dictionaries
 - Converts ints/floats and nulls
 - Validates column structure and skips malformed rows
 - Automatically removes duplicate rows
 - Writes cleaned CSV to data/spotify_clean.csv
 - Tracks and reports cleaning statistics
+- Can cache parsed columns in a .pkl sidecar next to the CSV
 """
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import os
 import csv
+import pickle
+import sys
+from collections import Counter
+from operator import itemgetter
 
 # ---------------------------------------------------------------
 # CONSTANTS
 # ---------------------------------------------------------------
 _NULLS = {"", "na", "n/a", "null", "none"}  # Strings considered as null/empty
+_NUMERIC_START = frozenset("+-.0123456789")  # First characters a number can have
+_NUMERIC_END = frozenset(".0123456789")  # Last characters a number can have
+_CACHE_VERSION = 3  # Bump when parsing/coercion changes, to invalidate .pkl sidecars
+_REPEAT_SAMPLE = 1000  # Leading values checked per column for repeated strings
+_REPEAT_MAX_UNIQUE = 0.75  # Share strings when at most this share of the sample is distinct
 
 # ---------------------------------------------------------------
 # GLOBAL COUNTERS (for stats)
@@ -34,115 +45,258 @@ stats = {
 # ---------------------------------------------------------------
 # FUNCTION: _coerce
 # PURPOSE: Converts each field (string) from the CSV into its proper Python type.
-#          - Turns numbers into int/float
+#          - Turns numbers into int/float (ASCII digits only)
 #          - Turns null-like strings into None
-#          - Keeps other text fields as strings
+#          - Keeps other text fields as strings, including "inf", "nan",
+#            "Infinity" (with or without a sign), which float() would accept
+#          Type counts for `stats` are tallied once per column afterwards
+#          (see _record_stats), not here on every field.
 # ---------------------------------------------------------------
 def _coerce(tok: str):
     t = tok.strip()
-    stats["total_fields"] += 1  # Count every processed field
-
-    if t.lower() in _NULLS:
-        stats["num_nulls"] += 1
+    if not t:
         return None
 
+    # Only a sign, dot or digit can start a number; everything else is text
+    # (or a null spelling, which always starts with a letter). This skips
+    # both failed int/float conversions for the text columns.
+    c0 = t[0]
+    if c0 not in _NUMERIC_START:
+        if c0.isalpha() and t.lower() in _NULLS:
+            return None
+        return t
+    # A number also ends with a digit or a dot, so signed words such as
+    # "-inf" or "+nan" stay text like "inf"/"nan"; and non-ASCII digits
+    # (which int()/float() accept) are not treated as numbers.
+    if t[-1] not in _NUMERIC_END or not t.isascii():
+        return t
+
     # Try integer
-    if t and (t.isdigit() or (t[0] == "-" and t[1:].isdigit())):
+    if t.isdigit() or (c0 == "-" and t[1:].isdigit()):
         try:
-            stats["num_ints"] += 1
             return int(t)
         except ValueError:
             pass
 
     # Try float
     try:
-        val = float(t)
-        stats["num_floats"] += 1
-        return val
+        return float(t)
     except ValueError:
-        stats["num_strings"] += 1
         return t
 
 
 # ---------------------------------------------------------------
-# FUNCTION: _split_csv_line
-# PURPOSE: Splits one line of text from a CSV into separate fields.
-#          It handles tricky cases like commas inside quotes and escaped quotes.
+# FUNCTION: _record_stats
+# PURPOSE: Adds one parse's totals to the global `stats` in one go.
+#          Field kinds are counted per column from the coerced values'
+#          types (None / int / float / str).
+# ---------------------------------------------------------------
+def _record_stats(cols: List[List[Any]], n_rows: int, n_malformed: int):
+    kinds: Counter = Counter()
+    for col in cols:
+        kinds.update(map(type, col))
+
+    stats["total_rows"] += n_rows
+    stats["malformed_rows"] += n_malformed
+    stats["total_fields"] += sum(kinds.values())
+    stats["num_nulls"] += kinds[type(None)]
+    stats["num_ints"] += kinds[int]
+    stats["num_floats"] += kinds[float]
+    stats["num_strings"] += kinds[str]
+
+
 # ---------------------------------------------------------------
-def _split_csv_line(line: str, delimiter: str = ",") -> List[str]:
-    fields, cur, in_quotes = [], [], False
-    i, n = 0, len(line)
+# FUNCTION: read_csv_columns
+# PURPOSE: Reads the entire CSV file record by record, converts each field
+#          using _coerce(), and stores the values column by column (one list
+#          per header name) instead of building one dictionary per row.
+#          Splitting (quotes, escaped quotes, commas inside quotes) is done by
+#          the C-implemented csv.reader.
+#          If `columns` is given, only those columns are converted and kept
+#          (in that order); the rest are skipped at parse time.
+#          String values in the `categorical` columns are interned, so each
+#          distinct value (e.g. a genre) is stored once instead of once per
+#          row. This saves memory; filters still compare by value (the UI's
+#          choices are separate objects, and strings loaded back from the
+#          .pkl sidecar are shared but no longer interned).
+#          With `share_repeated=True`, other text columns that repeat a lot
+#          (see _share_repeated_strings) get one shared object per distinct
+#          value too; off by default, so plain reads keep their values as parsed.
+#          Skips malformed lines that have a mismatched number of fields.
+#          With `max_rows`, reading stops after that many good rows (e.g. for
+#          a preview); such partial reads are not added to `stats`.
+# ---------------------------------------------------------------
+def read_csv_columns(path: str, delimiter: str = ",",
+                     columns: Optional[List[str]] = None,
+                     categorical: Optional[List[str]] = None,
+                     max_rows: Optional[int] = None,
+                     share_repeated: bool = False) -> Dict[str, List[Any]]:
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            return {}
+
+        records: List[List[Any]] = []
+        malformed = 0
+        width = len(header)
+
+        pick = None
+        if columns is not None:
+            if not columns:
+                raise ValueError("read_csv_columns: `columns` is empty; pass None to read every column.")
+            for col in columns:
+                if col not in header:
+                    raise ValueError(f"Column '{col}' not found in {path}.")
+            positions = [header.index(col) for col in columns]
+            if len(positions) == 1:
+                pos = positions[0]
+                pick = lambda parts: (parts[pos],)
+            else:
+                pick = itemgetter(*positions)  # returns a tuple of the picked fields
+            header = list(columns)
+
+        for parts in reader:
+            if len(records) == max_rows:
+                break
+            if len(parts) != width:
+                malformed += 1
+                continue  # skip bad line
+
+            records.append(list(map(_coerce, parts if pick is None else pick(parts))))
+
+    # Transpose the parsed records into one list per column in a single step.
+    cols = [list(col) for col in zip(*records)] if records else [[] for _ in header]
+    if max_rows is None:
+        _record_stats(cols, len(records), malformed)
+    result = dict(zip(header, cols))
+
+    interned = set(categorical or ())
+    for name, values in result.items():
+        if name in interned:
+            result[name] = [sys.intern(v) if type(v) is str else v for v in values]
+        elif share_repeated:
+            result[name] = _share_repeated_strings(values)
+    return result
+
 
-    while i < n:
-        ch = line[i]
-        if ch == '"':
-            if in_quotes and i + 1 < n and line[i + 1] == '"':
-                cur.append('"')
-                i += 2
-                continue
-            in_quotes = not in_quotes
-            i += 1
-            continue
+# ---------------------------------------------------------------
+# FUNCTION: _share_repeated_strings
+# PURPOSE: Dictionary-encodes low-cardinality text columns that are not in
+#          an explicit `categorical` list (opt-in, see read_csv_columns):
+#          if at most _REPEAT_MAX_UNIQUE of the first _REPEAT_SAMPLE strings
+#          are distinct (artists, playlist names, release dates), every equal
+#          string in the column is replaced by the first object seen with
+#          that value. Mostly-unique columns (titles, ids) and non-text
+#          columns are returned as is.
+# ---------------------------------------------------------------
+def _share_repeated_strings(values: List[Any]) -> List[Any]:
+    sample = [v for v in values[:_REPEAT_SAMPLE] if type(v) is str]
+    if not sample or len(set(sample)) > _REPEAT_MAX_UNIQUE * len(sample):
+        return values
+    shared: Dict[str, str] = {}
+    return [shared.setdefault(v, v) if type(v) is str else v for v in values]
 
-        if ch == delimiter and not in_quotes:
-            fields.append("".join(cur))
-            cur = []
-            i += 1
-            continue
 
-        if ch == "\n" and not in_quotes:
-            i += 1
-            continue
+# ---------------------------------------------------------------
+# FUNCTION: read_csv_columns_cached
+# PURPOSE: read_csv_columns() with an on-disk sidecar (<path>.pkl) holding
+#          the parsed columns. The sidecar is reused while it is newer than
+#          the CSV and was written for the same options and parser version;
+#          otherwise the CSV is parsed again and the sidecar rewritten.
+#          Loading the pickle skips tokenizing and type conversion entirely.
+#          With `cache_dir`, the sidecar is kept there (<cache_dir>/<name>.pkl)
+#          instead of next to the CSV, e.g. a temp folder for test runs.
+# ---------------------------------------------------------------
+def read_csv_columns_cached(path: str, delimiter: str = ",",
+                            columns: Optional[List[str]] = None,
+                            categorical: Optional[List[str]] = None,
+                            share_repeated: bool = False,
+                            cache_dir: Optional[str] = None) -> Dict[str, List[Any]]:
+    if cache_dir is None:
+        cache_path = path + ".pkl"
+    else:
+        cache_path = os.path.join(cache_dir, os.path.basename(path) + ".pkl")
+    key = (_CACHE_VERSION, os.path.abspath(path), delimiter,
+           None if columns is None else list(columns),
+           None if categorical is None else list(categorical),
+           share_repeated)
 
-        cur.append(ch)
-        i += 1
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(path):
+        try:
+            with open(cache_path, "rb") as f:
+                cached_key, cols = pickle.load(f)
+            if cached_key == key:
+                return cols
+        except Exception:
+            # The sidecar is only a cache: anything wrong with it (damaged,
+            # foreign or old-format pickle, unexpected shape) means parse
+            # again and rewrite it
+            pass
 
-    fields.append("".join(cur))
-    return fields
+    cols = read_csv_columns(path, delimiter, columns, categorical, share_repeated=share_repeated)
+    try:
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((key, cols), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass  # e.g. read-only data folder: the parsed columns are still returned
+    return cols
 
 
 # ---------------------------------------------------------------
 # FUNCTION: read_csv
-# PURPOSE: Reads the entire CSV file line by line, converts each field using
-#          _coerce(), and builds a list of dictionaries (rows).
-#          Skips malformed lines that have a mismatched number of fields.
+# PURPOSE: Same parse as read_csv_columns(), returned as a list of
+#          dictionaries (rows) for callers that want one record at a time.
+#          `max_rows` limits the read to the first rows of the file.
 # ---------------------------------------------------------------
-def read_csv(path: str, delimiter: str = ",") -> List[Dict[str, Any]]:
-    rows: List[Dict[str, Any]] = []
-    with open(path, "r", encoding="utf-8") as f:
-        header_line = f.readline()
-        if not header_line:
-            return rows
+def read_csv(path: str, delimiter: str = ",",
+             max_rows: Optional[int] = None) -> List[Dict[str, Any]]:
+    return _columns_to_rows(read_csv_columns(path, delimiter, max_rows=max_rows))
 
-        header = _split_csv_line(header_line.rstrip("\n"), delimiter)
 
-        for line in f:
-            parts = _split_csv_line(line.rstrip("\n"), delimiter)
-            if len(parts) != len(header):
-                stats["malformed_rows"] += 1
-                continue  # skip bad line
+# ---------------------------------------------------------------
+# FUNCTION: read_csv_cached
+# PURPOSE: read_csv() backed by the .pkl sidecar of read_csv_columns_cached(),
+#          so repeated loads of an unchanged CSV skip the parse and only
+#          rebuild the row dictionaries. `cache_dir` as there.
+# ---------------------------------------------------------------
+def read_csv_cached(path: str, delimiter: str = ",",
+                    cache_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    return _columns_to_rows(read_csv_columns_cached(path, delimiter, cache_dir=cache_dir))
 
-            row = {h: _coerce(v) for h, v in zip(header, parts)}
-            rows.append(row)
-            stats["total_rows"] += 1
 
-    return rows
+def _columns_to_rows(cols: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    header = list(cols)
+    return [dict(zip(header, values)) for values in zip(*cols.values())]
 
 
 # ---------------------------------------------------------------
 # FUNCTION: remove_duplicates
 # PURPOSE: Removes duplicate rows (keeps first occurrence).
+#          Rows from read_csv() all share the header's key order, so the
+#          values tuple alone identifies a row (no per-row sort needed).
+#          Only each tuple's hash is kept (mapped to the first row seen with
+#          it); full value tuples are stored just for rows whose hash
+#          collided with a different row, which is rare.
 # ---------------------------------------------------------------
 def remove_duplicates(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     unique_rows = []
-    seen = set()
+    first_by_hash: Dict[int, Dict[str, Any]] = {}
+    collided = set()
     for row in rows:
-        row_tuple = tuple(sorted(row.items()))
-        if row_tuple not in seen:
-            seen.add(row_tuple)
+        values = tuple(row.values())
+        h = hash(values)
+        first = first_by_hash.get(h)
+        if first is None:
+            first_by_hash[h] = row
             unique_rows.append(row)
-        else:
+        elif first == row or values in collided:
             stats["duplicates_removed"] += 1
+        else:
+            collided.add(values)
+            unique_rows.append(row)
     return unique_rows
 
 
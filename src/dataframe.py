@@ -5,11 +5,75 @@ Implements core SQL-like operations:
 - WHERE (filtering)
 - GROUP BY with aggregation
 - SORT and COUNT
+
+Data is stored column by column (one Python list per column name) so that
+scans, projections and aggregations walk one contiguous list at a time.
+Row dictionaries are only built when `.rows` is read, and then only for the
+rows actually indexed or iterated (see _RowView).
+Column lists are treated as immutable: operations build new lists (or share
+existing ones) and never modify a frame's lists in place.
+`cols` always has exactly the names in `columns` as keys, so column names are
+checked against the dict (a hash lookup) rather than scanning the list.
 """
 
-from typing import List, Dict, Any, Callable
-from collections import defaultdict
-import statistics
+import operator
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Sequence
+
+_NUMERIC = (int, float)  # value types that aggregations count
+
+# comparison operators accepted by DataFrame.where()
+_OPS = {
+    ">": operator.gt, ">=": operator.ge,
+    "<": operator.lt, "<=": operator.le,
+    "==": operator.eq, "!=": operator.ne,
+}
+
+# One column scan per operator with the comparison written inline: the
+# interpreter specializes `v > x` in a comprehension, which beats calling
+# operator.gt per value (even through map/compress) or a row lambda.
+# "!=" has no scan: it would also match values of another type.
+_SCANS = {
+    ">":  lambda values, x: [i for i, v in enumerate(values) if v is not None and v > x],
+    ">=": lambda values, x: [i for i, v in enumerate(values) if v is not None and v >= x],
+    "<":  lambda values, x: [i for i, v in enumerate(values) if v is not None and v < x],
+    "<=": lambda values, x: [i for i, v in enumerate(values) if v is not None and v <= x],
+    "==": lambda values, x: [i for i, v in enumerate(values) if v is not None and v == x],
+}
+
+
+# ---------------------------------------------------------------
+# CLASS: _RowView
+# PURPOSE: Read-only list-like view of a DataFrame's rows. Each row dict is
+#          built from the column lists when it is indexed or iterated, so
+#          e.g. rows[:5] on a 30k-row frame builds 5 dicts, not 30k.
+#          Slicing returns a plain list of dicts.
+# ---------------------------------------------------------------
+class _RowView(Sequence):
+    __slots__ = ("_names", "_cols", "_n")
+
+    def __init__(self, names: List[str], cols: Dict[str, List[Any]], n: int):
+        self._names = names
+        self._cols = [cols[c] for c in names]
+        self._n = n
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, index):
+        names = self._names
+        if isinstance(index, slice):
+            return [dict(zip(names, values))
+                    for values in zip(*(col[index] for col in self._cols))]
+        if index < 0:
+            index += self._n
+        if not 0 <= index < self._n:
+            raise IndexError("row index out of range")
+        return dict(zip(names, [col[index] for col in self._cols]))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        names = self._names
+        for values in zip(*self._cols):
+            yield dict(zip(names, values))
 
 
 # ---------------------------------------------------------------
@@ -17,13 +81,64 @@ import statistics
 # PURPOSE: Provides SQL-like operations on parsed CSV data
 # ---------------------------------------------------------------
 class DataFrame:
-    def __init__(self, rows: List[Dict[str, Any]]):
+    __slots__ = ("columns", "cols", "_n")
+
+    def __init__(self, rows: List[Dict[str, Any]], columns: Optional[List[str]] = None):
         """
         Initialize with a list of dictionaries (rows),
         each representing one record in the dataset.
+        The rows are transposed into one list per column.
+        `columns` (the row keys, in order) is derived from the first row
+        when not given.
         """
-        self.rows = rows
-        self.columns = list(rows[0].keys()) if rows else []
+        if columns is None:
+            columns = list(rows[0].keys()) if rows else []
+        self.columns = columns
+        self.cols = {col: [row[col] for row in rows] for col in self.columns}
+        self._n = len(rows)
+
+    # -----------------------------------------------------------
+    # METHOD: from_columns
+    # PURPOSE: Build a DataFrame directly from {column: list_of_values},
+    #          e.g. the output of csv_parser.read_csv_columns().
+    #          Derived frames pass their (unchanged) column list along so
+    #          it is not rebuilt from the dict keys every time.
+    # Example:
+    #   df = DataFrame.from_columns(read_csv_columns(path))
+    # -----------------------------------------------------------
+    @classmethod
+    def from_columns(cls, cols: Dict[str, List[Any]], columns: Optional[List[str]] = None):
+        df = cls.__new__(cls)
+        df.columns = list(cols.keys()) if columns is None else columns
+        df.cols = cols
+        df._n = len(next(iter(cols.values()))) if cols else 0
+        return df
+
+    # -----------------------------------------------------------
+    # PROPERTY: rows
+    # PURPOSE: Row-oriented view (sequence of dicts), read from the column
+    #          lists: a _RowView that builds each dict only when it is read.
+    # -----------------------------------------------------------
+    @property
+    def rows(self) -> Sequence[Dict[str, Any]]:
+        return _RowView(self.columns, self.cols, self._n)
+
+    # -----------------------------------------------------------
+    # METHOD: take
+    # PURPOSE: Build a new DataFrame from the given row positions
+    #          (in the given order). Used by filter and sort_by, and to
+    #          apply a selection from filters.build_selection().
+    #          range(n) over all rows shares the column lists (no copy).
+    # -----------------------------------------------------------
+    def take(self, indices: Iterable[int]):
+        # Every row in order (e.g. no filter active): share the column lists
+        if isinstance(indices, range) and indices == range(self._n):
+            return DataFrame.from_columns(dict(self.cols), columns=self.columns)
+        indices = list(indices)
+        return DataFrame.from_columns(
+            {col: [values[i] for i in indices] for col, values in self.cols.items()},
+            columns=self.columns,
+        )
 
     # -----------------------------------------------------------
     # METHOD: head
@@ -42,9 +157,39 @@ class DataFrame:
     #   df.filter(lambda r: r["popularity"] > 80)
     # -----------------------------------------------------------
     def filter(self, condition: Callable[[Dict[str, Any]], bool]):
-        filtered_rows = [row for row in self.rows if condition(row)]
-        print(f"✅ Filtered rows: {len(filtered_rows)} out of {len(self.rows)}")
-        return DataFrame(filtered_rows)
+        keep = [i for i, row in enumerate(self.rows) if condition(row)]
+        print(f"✅ Filtered rows: {len(keep)} out of {self._n}")
+        return self.take(keep)
+
+    # -----------------------------------------------------------
+    # METHOD: where
+    # PURPOSE: Column form of filter for a single comparison
+    #          (column <op> value). The comparison runs over the column
+    #          list itself, with no row dicts and no per-row function call.
+    #          Missing values and values of another type (e.g. text in a
+    #          numeric column) never match.
+    # Example:
+    #   df.where("popularity", ">", 80)
+    # -----------------------------------------------------------
+    def where(self, col: str, op: str, value: Any):
+        if col not in self.cols:
+            raise ValueError(f"Column '{col}' not found in dataset.")
+        if op not in _OPS:
+            raise ValueError(f"Unsupported operator: {op}")
+        values = self.cols[col]
+        keep = None
+        if op in _SCANS:
+            try:
+                keep = _SCANS[op](values, value)
+            except TypeError:
+                pass  # mixed text/numbers cannot be ordered against value
+        if keep is None:
+            compare = _OPS[op]
+            kind = _NUMERIC if isinstance(value, _NUMERIC) else type(value)
+            keep = [i for i, v in enumerate(values)
+                    if isinstance(v, kind) and compare(v, value)]
+        print(f"✅ Filtered rows: {len(keep)} out of {self._n}")
+        return self.take(keep)
 
     # -----------------------------------------------------------
     # METHOD: project
@@ -54,11 +199,14 @@ class DataFrame:
     # -----------------------------------------------------------
     def project(self, columns: List[str]):
         for col in columns:
-            if col not in self.columns:
+            if col not in self.cols:
                 raise ValueError(f"Column '{col}' not found in dataset.")
-        projected = [{col: row[col] for col in columns} for row in self.rows]
+        columns = list(columns)
+        # Column lists are never modified in place, so the projection can
+        # share them with this frame instead of copying N values per column.
+        projected = {col: self.cols[col] for col in columns}
         print(f"Projected columns: {columns}")
-        return DataFrame(projected)
+        return DataFrame.from_columns(projected, columns=columns)
 
     # -----------------------------------------------------------
     # METHOD: group_by
@@ -67,37 +215,73 @@ class DataFrame:
     #   df.group_by("artist_name", {"popularity": "avg"})
     # -----------------------------------------------------------
     def group_by(self, group_col: str, agg_map: Dict[str, str]):
-        groups = defaultdict(list)
-        for row in self.rows:
-            key = row[group_col]
-            groups[key].append(row)
-
-        result = []
-        for key, rows in groups.items():
-            agg_result = {group_col: key}
-            for col, func in agg_map.items():
-                values = [r[col] for r in rows if isinstance(r[col], (int, float))]
-                if not values:
-                    agg_result[col] = None
-                    continue
-
-                if func == "avg":
-                    agg_result[col] = statistics.mean(values)
-                elif func == "sum":
-                    agg_result[col] = sum(values)
-                elif func == "max":
-                    agg_result[col] = max(values)
-                elif func == "min":
-                    agg_result[col] = min(values)
-                elif func == "count":
-                    agg_result[col] = len(values)
-                else:
-                    raise ValueError(f"Unsupported aggregation: {func}")
-
-            result.append(agg_result)
-
-        print(f"Grouped by '{group_col}' with {len(result)} groups.")
-        return DataFrame(result)
+        for func in agg_map.values():
+            if func not in ("avg", "sum", "max", "min", "count"):
+                raise ValueError(f"Unsupported aggregation: {func}")
+
+        # Encode each key as a group number (first-seen order), then aggregate
+        # every column in one streaming pass with per-group running totals.
+        # One tight pass per aggregate column beats a single fused pass that
+        # loops over all accumulators per row (that inner loop runs in Python).
+        codes: Dict[Any, int] = {}
+        inverse = [codes.setdefault(key, len(codes)) for key in self.cols[group_col]]
+        n_groups = len(codes)
+
+        result = {group_col: list(codes)}
+        for col, func in agg_map.items():
+            if func in ("max", "min"):
+                best: List[Any] = [None] * n_groups
+                want_max = func == "max"
+                for g, v in zip(inverse, self.cols[col]):
+                    if isinstance(v, _NUMERIC):
+                        b = best[g]
+                        if b is None or (v > b if want_max else v < b):
+                            best[g] = v
+                result[col] = best
+                continue
+
+            sums: List[Any] = [0] * n_groups
+            counts = [0] * n_groups
+            for g, v in zip(inverse, self.cols[col]):
+                if isinstance(v, _NUMERIC):
+                    sums[g] += v
+                    counts[g] += 1
+
+            if func == "avg":
+                result[col] = [s / c if c else None for s, c in zip(sums, counts)]
+            elif func == "sum":
+                result[col] = [s if c else None for s, c in zip(sums, counts)]
+            else:  # count
+                result[col] = [c if c else None for c in counts]
+
+        print(f"Grouped by '{group_col}' with {n_groups} groups.")
+        return DataFrame.from_columns(result)
+
+    # -----------------------------------------------------------
+    # METHOD: filter_project_group
+    # PURPOSE: WHERE + SELECT + GROUP BY for one selection of row positions
+    #          (e.g. from filters.build_selection) in a single step.
+    #          Each column is gathered once for the selected rows; the
+    #          projection shares those lists and the grouping reads them
+    #          directly, instead of re-copying the data for every stage.
+    #          Returns (filtered, projected, grouped).
+    # Example:
+    #   df.filter_project_group(sel, ["track_name"], "track_artist",
+    #                           {"track_popularity": "avg"})
+    # -----------------------------------------------------------
+    def filter_project_group(self, selection: Iterable[int], project_cols: List[str],
+                             group_col: str, agg_map: Dict[str, str]):
+        for col in project_cols:
+            if col not in self.cols:
+                raise ValueError(f"Column '{col}' not found in dataset.")
+        filtered = self.take(selection)
+        print(f"✅ Filtered rows: {filtered.count()} out of {self._n}")
+        project_cols = list(project_cols)
+        projected = DataFrame.from_columns({col: filtered.cols[col] for col in project_cols},
+                                           columns=project_cols)
+        print(f"Projected columns: {project_cols}")
+        grouped = filtered.group_by(group_col, agg_map)
+        return filtered, projected, grouped
 
     # -----------------------------------------------------------
     # METHOD: sort_by
@@ -106,15 +290,25 @@ class DataFrame:
     #   df.sort_by("popularity", reverse=True)
     # -----------------------------------------------------------
     def sort_by(self, col: str, reverse: bool = False):
-        if col not in self.columns:
+        if col not in self.cols:
             raise ValueError(f"Column '{col}' not found.")
-        sorted_rows = sorted(self.rows, key=lambda r: (r[col] is None, r[col]), reverse=reverse)
+        # Sort row positions with the column's own __getitem__ as the key (a C
+        # call, no Python lambda per comparison). Missing values are set aside
+        # first and go last (or first when reverse=True), in their original order.
+        values = self.cols[col]
+        if None in values:
+            present = [i for i, v in enumerate(values) if v is not None]
+            missing = [i for i, v in enumerate(values) if v is None]
+        else:
+            present, missing = range(self._n), []
+        order = sorted(present, key=values.__getitem__, reverse=reverse)
+        order = missing + order if reverse else order + missing
         print(f"Sorted by '{col}' ({'DESC' if reverse else 'ASC'})")
-        return DataFrame(sorted_rows)
+        return self.take(order)
 
     # -----------------------------------------------------------
     # METHOD: count
     # PURPOSE: Return the total number of rows in the dataset.
     # -----------------------------------------------------------
     def count(self):
-        return len(self.rows)
+        return self._n
@@ -1,10 +1,10 @@
 """
 filters.py
-Parsing utilities and predicate builder for filtering rows.
+Parsing utilities and the column-wise selection used for filtering rows.
 No Streamlit or I/O here.
 """
 
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Dict, Any, Optional, Tuple, List, Sequence
 
 # ---------- range parsing ----------
 
@@ -26,25 +26,35 @@ def parse_range_or_any(s: Optional[str]) -> Optional[Tuple[float, float]]:
     except Exception:
         return None
 
-def in_bucket(val: Optional[float], rng: Tuple[float, float], top_inclusive=False) -> bool:
-    """
-    Default [low, high). If top_inclusive=True use [low, high].
-    """
-    if val is None:
-        return False
-    low, high = rng
-    if top_inclusive:
-        return (val >= low) and (val <= high)
-    return (val >= low) and (val < high)
-
 # ---------- month/year parsing ----------
 
+_NAME_TO_MONTH = {
+    "jan": 1, "january": 1,
+    "feb": 2, "february": 2,
+    "mar": 3, "march": 3,
+    "apr": 4, "april": 4,
+    "may": 5,
+    "jun": 6, "june": 6,
+    "jul": 7, "july": 7,
+    "aug": 8, "august": 8,
+    "sep": 9, "sept": 9, "september": 9,
+    "oct": 10, "october": 10,
+    "nov": 11, "november": 11,
+    "dec": 12, "december": 12,
+}
+
 def month_to_int_or_any(m: Optional[str]) -> Optional[int]:
     """
     Accept 1-12 or labels like "Jan (1)". ANY/blank/invalid → None.
     """
-    if not m:
+    if not m or m == "ANY":
         return None
+    # fast path for the UI's own labels, e.g. "Jan (1)"
+    if isinstance(m, str) and m.endswith(")") and "(" in m:
+        try:
+            return int(m[m.rfind("(")+1:-1])
+        except ValueError:
+            return None
     s = str(m).strip().lower()
     if s == "any":
         return None
@@ -57,21 +67,7 @@ def month_to_int_or_any(m: Optional[str]) -> Optional[int]:
         except Exception:
             return None
     # also accept short/long names
-    name_to_num = {
-        "jan": 1, "january": 1,
-        "feb": 2, "february": 2,
-        "mar": 3, "march": 3,
-        "apr": 4, "april": 4,
-        "may": 5,
-        "jun": 6, "june": 6,
-        "jul": 7, "july": 7,
-        "aug": 8, "august": 8,
-        "sep": 9, "sept": 9, "september": 9,
-        "oct": 10, "october": 10,
-        "nov": 11, "november": 11,
-        "dec": 12, "december": 12,
-    }
-    return name_to_num.get(s)
+    return _NAME_TO_MONTH.get(s)
 
 def parse_year_or_any(y: Optional[str]) -> Optional[int]:
     """
@@ -86,22 +82,49 @@ def parse_year_or_any(y: Optional[str]) -> Optional[int]:
 
 # ---------- options helpers ----------
 
-def unique_non_null(rows: List[Dict[str, Any]], col: str) -> List[str]:
-    return sorted({r.get(col) for r in rows if r.get(col) not in (None, "")})
+def unique_non_null(cols: Dict[str, List[Any]], col: str) -> List[str]:
+    vals = set(cols[col])  # built in C, then drop the empty markers
+    vals.discard(None)
+    vals.discard("")
+    return sorted(vals)
+
+def subgenres_by_genre(cols: Dict[str, List[Any]]) -> Dict[str, List[str]]:
+    """
+    {genre: sorted subgenres} for every genre, built in one pass.
+    """
+    subs: Dict[str, set] = {}
+    for g, sub in zip(cols["playlist_genre"], cols["playlist_subgenre"]):
+        if g not in (None, "") and sub not in (None, ""):
+            subs.setdefault(g, set()).add(sub)
+    return {g: sorted(s) for g, s in subs.items()}
+
+# ---------- release date parts ----------
 
-def subgenres_for_genre(rows: List[Dict[str, Any]], genre: Optional[str]) -> List[str]:
-    if not genre:
-        return []
-    subs = {
-        r.get("playlist_subgenre")
-        for r in rows
-        if r.get("playlist_genre") == genre and r.get("playlist_subgenre") not in (None, "")
-    }
-    return sorted(subs)
+def _release_year_month(ds: Any) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Split "YYYY-MM-DD" into (year, month); anything else → (None, None).
+    """
+    if isinstance(ds, str) and len(ds) >= 7 and ds[4] == "-":
+        parts = ds.split("-")
+        if len(parts) >= 2 and parts[0].isdigit() and parts[1].isdigit():
+            return int(parts[0]), int(parts[1])
+    return None, None
+
+def release_columns(cols: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+    """
+    Extract {"release_year": [...], "release_month": [...]} (ints, None if the
+    date is not "YYYY-MM...") from track_album_release_date.
+    Returned as a separate dict, so the table's own columns are unchanged;
+    compute it once per table and pass it to build_selection().
+    """
+    parts = [_release_year_month(d) for d in cols["track_album_release_date"]]
+    years, months = (list(p) for p in zip(*parts)) if parts else ([], [])
+    return {"release_year": years, "release_month": months}
 
-# ---------- predicate builder ----------
+# ---------- column-wise selection ----------
 
-def build_predicate(
+def build_selection(
+    cols: Dict[str, List[Any]],
     pop_range: Optional[Tuple[float, float]],
     genre: Optional[str],
     subgenre: Optional[str],
@@ -111,48 +134,53 @@ def build_predicate(
     live_range: Optional[Tuple[float, float]],
     month: Optional[int],
     year: Optional[int],
-):
+    release: Optional[Dict[str, List[Any]]] = None,
+) -> Sequence[int]:
     """
-    Returns a function(row) -> bool that applies AND logic across all filters.
+    Returns the positions of the rows that pass every filter (AND logic),
+    in their original order
+    (range(n) itself when no filter is active).
+    Each active filter narrows the surviving positions with one pass over its
+    own column, so later filters only look at rows that are still in play;
+    the most selective equality filters (genre, subgenre, year) run first.
+    Month/year use `release` (the output of release_columns(cols)); it is
+    computed here if not given and a month/year filter is active.
     None means ANY (skip that check).
     """
-    top_pop = pop_range is not None and abs(pop_range[1] - 100.0) < 1e-9
-    top_01  = lambda rng: (rng is not None) and abs(rng[1] - 1.0) < 1e-9
-
-    def _pred(row: Dict[str, Any]) -> bool:
-        # 1) popularity
-        if pop_range is not None and not in_bucket(row.get("track_popularity"), pop_range, top_inclusive=top_pop):
-            return False
-        # 2) genre
-        if genre and row.get("playlist_genre") != genre:
-            return False
-        # 3) subgenre
-        if subgenre and row.get("playlist_subgenre") != subgenre:
-            return False
-        # 4) danceability
-        if dance_range is not None and not in_bucket(row.get("danceability"), dance_range, top_inclusive=top_01(dance_range)):
-            return False
-        # 5) energy
-        if energy_range is not None and not in_bucket(row.get("energy"), energy_range, top_inclusive=top_01(energy_range)):
-            return False
-        # 6) tempo (inclusive upper bound for convenience)
-        if tempo_range is not None and not in_bucket(row.get("tempo"), tempo_range, top_inclusive=True):
-            return False
-        # 7) liveness
-        if live_range is not None and not in_bucket(row.get("liveness"), live_range, top_inclusive=top_01(live_range)):
-            return False
-        # 8) month/year — expects "YYYY-MM-DD"
-        if (month is not None) or (year is not None):
-            ds = row.get("track_album_release_date")
-            m2 = y2 = None
-            if isinstance(ds, str) and len(ds) >= 7 and ds[4] == "-":
-                parts = ds.split("-")
-                if len(parts) >= 2 and parts[0].isdigit() and parts[1].isdigit():
-                    y2, m2 = int(parts[0]), int(parts[1])
-            if (month is not None) and (m2 != month):
-                return False
-            if (year is not None) and (y2 != year):
-                return False
-        return True
-
-    return _pred
+    n = len(next(iter(cols.values()))) if cols else 0
+    sel: Sequence[int] = range(n)  # stays a range when every filter is ANY
+
+    def keep_equal(values: List[Any], target: Any) -> List[int]:
+        return [i for i in sel if values[i] == target]
+
+    def keep_range(col: str, rng: Tuple[float, float], top_inclusive: bool) -> List[int]:
+        values = cols[col]
+        low, high = rng
+        if top_inclusive:
+            return [i for i in sel if (v := values[i]) is not None and low <= v <= high]
+        return [i for i in sel if (v := values[i]) is not None and low <= v < high]
+
+    top_01 = lambda rng: abs(rng[1] - 1.0) < 1e-9
+
+    if (year is not None or month is not None) and release is None:
+        release = release_columns(cols)
+
+    if genre:
+        sel = keep_equal(cols["playlist_genre"], genre)
+    if subgenre:
+        sel = keep_equal(cols["playlist_subgenre"], subgenre)
+    if year is not None:
+        sel = keep_equal(release["release_year"], year)
+    if pop_range is not None:
+        sel = keep_range("track_popularity", pop_range, abs(pop_range[1] - 100.0) < 1e-9)
+    if dance_range is not None:
+        sel = keep_range("danceability", dance_range, top_01(dance_range))
+    if energy_range is not None:
+        sel = keep_range("energy", energy_range, top_01(energy_range))
+    if tempo_range is not None:
+        sel = keep_range("tempo", tempo_range, True)  # inclusive upper bound for convenience
+    if live_range is not None:
+        sel = keep_range("liveness", live_range, top_01(live_range))
+    if month is not None:
+        sel = keep_equal(release["release_month"], month)
+    return sel
@@ -1,28 +1,49 @@
 """
 services.py
 Business logic using csv_parser.py and dataframe.py:
-- load rows
+- load rows (or a column-oriented DataFrame)
 - compute UI options (genres, subgenres, tempo buckets, month/year lists)
-- apply filters via DataFrame.filter
-- project via DataFrame.project
-- group_by via DataFrame.group_by
+- apply filters via a column-wise selection (filters.build_selection + DataFrame.take)
+- project + group_by on the filtered rows via DataFrame.filter_project_group
 - sort_by via DataFrame.sort_by
 """
 
 import os
+from functools import lru_cache
 from typing import Dict, Any, List, Optional, Tuple
 
-from csv_parser import read_csv
+from csv_parser import read_csv, read_csv_columns_cached
 from dataframe import DataFrame
 from filters import (
     unique_non_null,
-    subgenres_for_genre,
+    subgenres_by_genre,
     parse_range_or_any,
     month_to_int_or_any,
     parse_year_or_any,
-    build_predicate,
+    build_selection,
+    release_columns,
 )
 
+# Columns the pipeline reads; other columns in the CSV are skipped by the
+# parser instead of being converted and kept.
+TABLE_COLS = [
+    "track_name",
+    "track_artist",
+    "track_popularity",
+    "track_album_name",
+    "track_album_release_date",
+    "playlist_genre",
+    "playlist_subgenre",
+    "danceability",
+    "energy",
+    "tempo",
+    "liveness",
+]
+
+# Low-cardinality text columns: their strings are interned at parse time, so
+# each distinct genre/subgenre/artist is held once in memory.
+CATEGORICAL_COLS = ["track_artist", "playlist_genre", "playlist_subgenre"]
+
 PROJECT_COLS = ["track_name", "track_artist", "track_album_name", "track_album_release_date"]
 
 def load_rows(path: str) -> List[Dict[str, Any]]:
@@ -30,8 +51,35 @@ def load_rows(path: str) -> List[Dict[str, Any]]:
         raise FileNotFoundError(f"Missing file: {path}")
     return read_csv(path)
 
-def build_options(rows: List[Dict[str, Any]], genre_choice: Optional[str]):
-    """Compute dropdown options for the UI."""
+def load_table(path: str) -> DataFrame:
+    """
+    Parse the CSV straight into a column-oriented DataFrame, keeping only
+    TABLE_COLS; repeated strings (release dates etc.) share one object.
+    The parsed columns are cached in a .pkl sidecar next to the CSV, so later
+    loads skip parsing until the CSV changes.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Missing file: {path}")
+    cols = read_csv_columns_cached(path, columns=TABLE_COLS, categorical=CATEGORICAL_COLS,
+                                   share_repeated=True)
+    return DataFrame.from_columns(cols)
+
+# Release year/month for the date filters, extracted once per table and kept
+# out of the table itself (they are not part of the displayed schema).
+# Every per-table cache holds only the most recent table (maxsize=1), so a
+# reloaded table does not keep older copies alive.
+@lru_cache(maxsize=1)
+def _release_columns(table: DataFrame) -> Dict[str, List[Any]]:
+    return release_columns(table.cols)
+
+# Options that depend only on the dataset are cached per table object (the
+# loaded table is never mutated); only the subgenre list depends on the genre.
+# The cached option lists are stored as tuples and build_options() hands out
+# fresh lists, so a caller editing its options cannot change the cache.
+@lru_cache(maxsize=1)
+def _dataset_options(table: DataFrame) -> Dict[str, Tuple[str, ...]]:
+    cols = table.cols
+
     # Popularity buckets 0-10 ... 90-100
     pop_options = ["ANY"] + [f"{i}-{i+10}" for i in range(0, 100, 10)]
 
@@ -39,14 +87,11 @@ def build_options(rows: List[Dict[str, Any]], genre_choice: Optional[str]):
     float_buckets = ["ANY"] + [f"{i/10:.1f}-{(i+1)/10:.1f}" for i in range(0, 10)]
 
     # Genres & subgenres
-    genres = ["ANY"] + unique_non_null(rows, "playlist_genre")
-    if (genre_choice and genre_choice != "ANY"):
-        sub_opts = ["ANY"] + subgenres_for_genre(rows, genre_choice)
-    else:
-        sub_opts = ["ANY"] + unique_non_null(rows, "playlist_subgenre")
+    genres = ["ANY"] + unique_non_null(cols, "playlist_genre")
+    all_subgenres = ["ANY"] + unique_non_null(cols, "playlist_subgenre")
 
     # Tempo buckets (20 BPM steps) based on dataset min/max
-    tempos = [r.get("tempo") for r in rows if isinstance(r.get("tempo"), (int, float))]
+    tempos = [t for t in cols["tempo"] if isinstance(t, (int, float))]
     if tempos:
         tmin, tmax = int(min(tempos)), int(max(tempos))
         tempo_opts = ["ANY"]
@@ -64,24 +109,37 @@ def build_options(rows: List[Dict[str, Any]], genre_choice: Optional[str]):
     ]
 
     # Year options from data
-    years = sorted({int(r["track_album_release_date"][:4]) for r in rows
-                    if isinstance(r.get("track_album_release_date"), str)
-                    and len(r["track_album_release_date"]) >= 4
-                    and r["track_album_release_date"][:4].isdigit()})
+    years = sorted({int(d[:4]) for d in cols["track_album_release_date"]
+                    if isinstance(d, str) and len(d) >= 4 and d[:4].isdigit()})
     year_opts = ["ANY"] + [str(y) for y in years]
 
     return {
-        "pop_options": pop_options,
-        "float_buckets": float_buckets,
-        "genres": genres,
-        "subgenres": sub_opts,
-        "tempo_options": tempo_opts,
-        "month_labels": month_labels,
-        "year_options": year_opts,
+        "pop_options": tuple(pop_options),
+        "float_buckets": tuple(float_buckets),
+        "genres": tuple(genres),
+        "subgenres": tuple(all_subgenres),
+        "tempo_options": tuple(tempo_opts),
+        "month_labels": tuple(month_labels),
+        "year_options": tuple(year_opts),
     }
 
+@lru_cache(maxsize=1)
+def _subgenres_by_genre(table: DataFrame) -> Dict[str, Tuple[str, ...]]:
+    return {g: tuple(subs) for g, subs in subgenres_by_genre(table.cols).items()}
+
+def _subgenre_options_for(table: DataFrame, genre_choice: Optional[str]) -> List[str]:
+    if (genre_choice and genre_choice != "ANY"):
+        return ["ANY", *_subgenres_by_genre(table).get(genre_choice, ())]
+    return list(_dataset_options(table)["subgenres"])
+
+def build_options(table: DataFrame, genre_choice: Optional[str]):
+    """Compute dropdown options for the UI (new lists on every call)."""
+    opts = {name: list(values) for name, values in _dataset_options(table).items()}
+    opts["subgenres"] = _subgenre_options_for(table, genre_choice)
+    return opts
+
 def apply_pipeline(
-    rows: List[Dict[str, Any]],
+    table: DataFrame,
     pop_bucket: Optional[str],
     genre_choice: Optional[str],
     subgenre_choice: Optional[str],
@@ -95,13 +153,13 @@ def apply_pipeline(
 ):
     """
     Full pipeline using your DataFrame:
-      - filter (WHERE)
+      - filter (WHERE, evaluated column by column)
       - project (SELECT)
       - group_by artist (GROUP BY ... AVG)
       - sort_by chosen aggregate (ORDER BY ASC)
     Returns (df_raw, df_filtered, df_projected, df_grouped, df_sorted)
     """
-    df_raw = DataFrame(rows)
+    df_raw = table
 
     # Resolve UI selections to typed filters (None == ANY)
     pop_range   = parse_range_or_any(pop_bucket)
@@ -115,20 +173,22 @@ def apply_pipeline(
     genre_val    = None if (not genre_choice or genre_choice == "ANY") else genre_choice
     subgenre_val = None if (not subgenre_choice or subgenre_choice == "ANY") else subgenre_choice
 
-    # WHERE
-    predicate = build_predicate(
+    # WHERE (positions of the matching rows)
+    date_filter = (month_val is not None) or (year_val is not None)
+    selection = build_selection(
+        df_raw.cols,
         pop_range, genre_val, subgenre_val,
         dance_range, energy_range, tempo_range, live_range,
-        month_val, year_val
+        month_val, year_val,
+        release=_release_columns(df_raw) if date_filter else None,
     )
-    df_filtered = df_raw.filter(predicate)
-
-    # SELECT
-    df_projected = df_filtered.project(PROJECT_COLS)
 
-    # GROUP BY (avg popularity & avg danceability per artist)
+    # WHERE + SELECT + GROUP BY (avg popularity & avg danceability per artist),
+    # sharing one gather of the selected rows across all three results
     agg_map = {"track_popularity": "avg", "danceability": "avg"}
-    df_grouped = df_filtered.group_by("track_artist", agg_map)
+    df_filtered, df_projected, df_grouped = df_raw.filter_project_group(
+        selection, PROJECT_COLS, "track_artist", agg_map
+    )
 
     # ORDER BY (ascending) on selected aggregate
     sort_key = None
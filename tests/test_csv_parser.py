@@ -22,7 +22,27 @@ sys.path.insert(0, project_root)
 # ---------------------------------------------------------------
 # Import from src/
 # ---------------------------------------------------------------
-from src.csv_parser import read_csv, write_clean_csv, print_stats
+from src.csv_parser import read_csv, write_clean_csv, print_stats, _coerce
+
+# ---------------------------------------------------------------
+# Field coercion regression checks
+# Numbers are ASCII digits with an optional sign/dot/exponent; words that
+# float() would also accept ("inf", "nan", "Infinity", with or without a
+# sign) and non-ASCII digits stay text, e.g. the track title "Infinity".
+# ---------------------------------------------------------------
+coerce_cases = {
+    "42": 42, "-7": -7, "+4": 4.0, "0.5": 0.5, ".5": 0.5, "1e3": 1000.0,
+    "": None, "  ": None, "NA": None, "null": None, "None": None,
+    "Infinity": "Infinity", "-Infinity": "-Infinity", "inf": "inf",
+    "-inf": "-inf", "nan": "nan", "+nan": "+nan",
+    "\u0663": "\u0663", "-\u0663": "-\u0663", "\uff11\uff12": "\uff11\uff12",
+    "-": "-", "1,000": "1,000", " Intro ": "Intro",
+}
+for token, expected in coerce_cases.items():
+    got = _coerce(token)
+    assert got == expected and type(got) is type(expected), \
+        f"_coerce({token!r}) returned {got!r}, expected {expected!r}"
+print(f"_coerce regression checks passed ({len(coerce_cases)} cases).")
 
 # ---------------------------------------------------------------
 # Define file paths
@@ -38,22 +58,23 @@ if not os.path.exists(csv_path):
     exit()
 
 # ---------------------------------------------------------------
-# Read and parse CSV
+# Preview sample rows (only the first 3 rows are parsed)
 # ---------------------------------------------------------------
 print(f"Reading CSV file from: {csv_path}")
-rows = read_csv(csv_path)
-print(f"Successfully parsed {len(rows):,} rows.")
-
-# ---------------------------------------------------------------
-# Preview sample rows
-# ---------------------------------------------------------------
-if rows:
+preview = read_csv(csv_path, max_rows=3)
+if preview:
     print("\nExample Dataset of the first 3 rows:")
-    for i, row in enumerate(rows[:3], start=1):
+    for i, row in enumerate(preview, start=1):
         print(f"\nRow {i}:")
         for key, value in list(row.items())[:10]:
             print(f"  {key}: {value}")
 
+# ---------------------------------------------------------------
+# Read and parse the full CSV (for the cleaned file)
+# ---------------------------------------------------------------
+rows = read_csv(csv_path)
+print(f"\nSuccessfully parsed {len(rows):,} rows.")
+
 # ---------------------------------------------------------------
 # Write cleaned CSV
 # ---------------------------------------------------------------
@@ -20,8 +20,10 @@ Output is verbose and meant to be human-readable: you’ll see previews of rows,
 confirmation messages, and explicit assertions if something goes wrong.
 """
 
+import operator
 import os
 import sys
+import tempfile
 
 # ---------------------------------------------------------------
 # 0. Path setup — ensures imports work from src/
@@ -39,9 +41,9 @@ sys.path.insert(0, PROJECT_ROOT)
 # ---------------------------------------------------------------
 from src.dataframe import DataFrame  # your main DataFrame class
 try:
-    from src.csv_parser import read_csv  # prefer your own CSV reader
+    from src.csv_parser import read_csv, read_csv_cached  # prefer your own CSV reader
 except Exception:
-    read_csv = None  # fallback if not available
+    read_csv = read_csv_cached = None  # fallback if not available
 
 
 # ---------------------------------------------------------------
@@ -56,6 +58,8 @@ def choose_col(possible_names, available):
         choose_col(["artist_name", "track_artist", "artist"], df.columns)
     returns whichever one actually exists in your dataset.
     """
+    # one set for all lookups, instead of scanning the column list per name
+    available = available if isinstance(available, (set, frozenset)) else frozenset(available)
     for name in possible_names:
         if name in available:
             return name
@@ -84,6 +88,9 @@ def load_rows():
     Falls back to raw CSV (spotify_songs.csv) otherwise.
 
     Uses your own csv_parser.read_csv() so data types stay consistent.
+    The cleaned CSV is read through read_csv_cached(), which reuses the
+    parsed columns on later runs; that cache lives in the system temp
+    folder, so running the tests leaves nothing in data/.
     """
     data_dir = os.path.join(PROJECT_ROOT, "data")
     clean_path = os.path.join(data_dir, "spotify_clean.csv")
@@ -93,7 +100,7 @@ def load_rows():
         print(f"📄 Using cleaned CSV: {clean_path}")
         if read_csv is None:
             raise RuntimeError("csv_parser.read_csv not available; please run cleaning first.")
-        return read_csv(clean_path)
+        return read_csv_cached(clean_path, cache_dir=tempfile.gettempdir())
 
     print("⚠️ Cleaned file not found. Falling back to raw CSV and parsing in-memory.")
     if not os.path.exists(raw_path):
@@ -151,6 +158,14 @@ def main():
         print(f"✅ Filtered rows: {popular.count()} out of {df.count()}")
         preview_rows(popular.rows, n=2, k=6)
 
+        print("\n— TEST: where (column form of the same filter) —")
+        popular_where = df.where(pop_col, ">", 80)
+        assert popular_where.count() == popular.count(), \
+            "where() should keep the same rows as the equivalent filter() lambda"
+        assert popular_where.cols[pop_col] == popular.cols[pop_col], \
+            "where() should keep the rows in their original order"
+        print(f"✅ where() matches filter(): {popular_where.count()} rows")
+
     # -----------------------------------------------------------
     # 4.2 PROJECT TEST
     # -----------------------------------------------------------
@@ -158,9 +173,13 @@ def main():
     cols_to_keep = [c for c in [track_col, artist_col, pop_col] if c]
     assert len(cols_to_keep) > 0, "No suitable columns found to project."
     proj = df.project(cols_to_keep)
-    # Check that projection keeps only desired keys
-    assert all(set(row.keys()) == set(cols_to_keep) for row in proj.rows[:10]), \
+    # Check that projection keeps only desired keys in the emitted rows,
+    # and every projected column still has one value per input row
+    expected_keys = set(cols_to_keep)
+    assert all(row.keys() == expected_keys for row in proj.rows[:10]), \
         "Projection kept unexpected columns"
+    assert all(len(proj.cols[c]) == df.count() for c in cols_to_keep), \
+        "Projected columns should keep every row"
     print(f"✅ Projected columns: {cols_to_keep}")
     preview_rows(proj.rows, n=2, k=len(cols_to_keep))
 
@@ -173,8 +192,11 @@ def main():
         assert grouped.count() > 0, "group_by should produce at least one group"
 
         # ✅ Group key validation (robust against None keys)
-        input_keys = {r.get(artist_col) for r in df.rows}
-        group_keys = {r.get(artist_col) for r in grouped.rows}
+        # Keys come straight from the column store (no row dicts are built);
+        # the difference lists in the message are only computed on failure.
+        input_keys = set(df.cols[artist_col])
+        group_keys = set(grouped.cols[artist_col])
+        assert len(group_keys) == grouped.count(), "group_by produced a key more than once"
         assert group_keys == input_keys, (
             "Group keys in result do not match unique keys from input.\n"
             f"Missing in result: {sorted(k for k in (input_keys - group_keys) if k is not None)[:10]}\n"
@@ -196,12 +218,14 @@ def main():
     sorted_df = df.sort_by(sort_target, reverse=False)
     assert sorted_df.count() == df.count(), "Sorting should not change row count"
 
-    # Light sanity check: first two values are non-decreasing
-    a = next((r[sort_target] for r in sorted_df.rows if r.get(sort_target) is not None), None)
-    b = next((r[sort_target] for r in sorted_df.rows if r.get(sort_target) is not None and r[sort_target] != a), None)
-    if a is not None and b is not None:
-        assert a <= b or isinstance(a, str) or isinstance(b, str), "Ascending sort check failed"
-    print("✅ sort_by produced correctly ordered rows (basic sanity check).")
+    # Check the sorted column directly: missing values come last and the rest
+    # are non-decreasing (sort_by raises on values that cannot be compared,
+    # so no mixed-type allowance is needed here)
+    values = sorted_df.cols[sort_target]
+    present = [v for v in values if v is not None]
+    assert values[:len(present)] == present, "Missing values should sort last"
+    assert all(map(operator.le, present, present[1:])), "Ascending sort check failed"
+    print("✅ sort_by produced correctly ordered rows.")
 
     # -----------------------------------------------------------
     # 4.5 ERROR HANDLING TEST